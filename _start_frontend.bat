@@ -1,5 +0,0 @@
-@echo off
-title Frontend - Sugar Commodity AI Chatbot
-cd /d "C:\Users\YASH SINGH\AI_Chatbot_Kearney\chatbot-frontend"
-npm run dev
-pause
\ No newline at end of file
@@ -1,10 +1,35 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from typing import List, Dict
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns read from the CSV (anything else in the file is skipped at parse time)
+CSV_COLUMNS = ['Commodity', 'Top Supplier', 'Quantity (KG)', 'Spend (USD)']
+
+
+def _format_numbers(values: pd.Series, spec: str) -> pa.Array:
+    """
+    Format a numeric column into an Arrow string array.
+
+    Why: Mapping a bound str.format over native Python floats skips the
+    numpy-scalar boxing and intermediate Series that Series.map creates.
+    """
+    return pa.array(
+        list(map(spec.format, values.to_numpy(dtype=np.float64).tolist())),
+        pa.string()
+    )
+
+
+def _format_quantity(value: float) -> str:
+    """Thousands-separated quantity keeping fractions (4,214 / 12.5), like the row text"""
+    return f"{value:,.2f}".rstrip('0').rstrip('.')
+
+
 class DataProcessor:
     """
     Processes CSV data and creates text chunks for embeddings.
@@ -17,12 +42,22 @@ class DataProcessor:
     def __init__(self, csv_path: str):
         self.csv_path = csv_path
         self.df = None
+        self._df_clean = None
         self.load_data()
 
     def load_data(self):
-        """Load and validate CSV data"""
+        """
+        Load and validate CSV data.
+
+        Why: The pyarrow engine parses multi-threaded in C++ and strips the
+        UTF-8 BOM; usecols skips allocating columns we never use. usecols
+        matches raw header names exactly, so the header is read first and
+        padded or BOM-prefixed names are mapped back to their raw spelling.
+        """
         try:
-            self.df = pd.read_csv(self.csv_path)
+            header = pd.read_csv(self.csv_path, nrows=0).columns
+            usecols = [col for col in header if col.strip().replace('\ufeff', '') in CSV_COLUMNS]
+            self.df = pd.read_csv(self.csv_path, engine='pyarrow', usecols=usecols)
             logger.info(f"Loaded {len(self.df)} rows from {self.csv_path}")
             logger.info(f"Columns: {list(self.df.columns)}")
         except Exception as e:
@@ -34,27 +69,51 @@ class DataProcessor:
         Clean and sanitize data.
 
         Why: Remove nulls, standardize formats, handle data quality issues
-        before embedding generation.
+        before embedding generation. The result is cached so chunk creation
+        and summary stats share a single cleaned frame.
         """
-        df_clean = self.df.copy()
+        if self._df_clean is not None:
+            return self._df_clean
 
-        # Remove rows with missing values
-        df_clean = df_clean.dropna()
+        # Remove rows with missing values (dropna returns a new frame, so the
+        # raw data is never mutated and no extra copy is needed)
+        df_clean = self.df.dropna()
 
         # Standardize column names (remove BOM, whitespace)
         df_clean.columns = df_clean.columns.str.strip().str.replace('\ufeff', '')
 
-        # Convert numeric columns
-        if 'Quantity (KG)' in df_clean.columns:
-            df_clean['Quantity (KG)'] = pd.to_numeric(df_clean['Quantity (KG)'], errors='coerce')
-        if 'Spend (USD)' in df_clean.columns:
-            df_clean['Spend (USD)'] = pd.to_numeric(df_clean['Spend (USD)'], errors='coerce')
+        # Convert numeric columns (a no-op when the parser already inferred
+        # numbers; coerces stray text in dirty files to NaN)
+        columns = {
+            col: pd.to_numeric(df_clean[col], errors='coerce')
+            for col in ('Quantity (KG)', 'Spend (USD)') if col in df_clean.columns
+        }
 
         # Calculate derived metrics for richer context
-        if 'Spend (USD)' in df_clean.columns and 'Quantity (KG)' in df_clean.columns:
-            df_clean['Price_per_KG'] = df_clean['Spend (USD)'] / df_clean['Quantity (KG)']
+        # Why: Zero or unparseable quantities would put inf/NaN prices into the
+        # embeddings, so divide only where quantity > 0 and drop the rest
+        if len(columns) == 2:
+            spend = columns['Spend (USD)'].to_numpy(dtype=np.float64)
+            qty = columns['Quantity (KG)'].to_numpy(dtype=np.float64)
+            columns['Price_per_KG'] = np.divide(
+                spend, qty, out=np.full_like(spend, np.nan), where=qty > 0
+            )
+
+        # Add every column in one assign; item assignment on the dropna()
+        # result would raise SettingWithCopyWarning when rows were dropped
+        df_clean = df_clean.assign(**columns)
+        if 'Price_per_KG' in columns:
+            df_clean = df_clean[np.isfinite(columns['Price_per_KG'])]
+
+        # Store repeated names once per unique value
+        # Why: Suppliers and commodities repeat across rows; categoricals shrink
+        # memory and speed up the groupby used for summary chunks
+        df_clean = df_clean.astype({
+            col: 'category' for col in ('Commodity', 'Top Supplier') if col in df_clean.columns
+        })
 
         logger.info(f"Cleaned data: {len(df_clean)} rows")
+        self._df_clean = df_clean
         return df_clean
 
     def create_text_chunks(self) -> List[Dict]:
@@ -66,61 +125,146 @@ class DataProcessor:
         quantity view) to improve retrieval for various query types.
         """
         df_clean = self.clean_data()
-        chunks = []
 
-        for idx, row in df_clean.iterrows():
-            # Create multiple text representations for better retrieval
+        # Format numeric columns once per column instead of once per row, then
+        # assemble every text variant with Arrow kernels
+        # Why: Row-wise f-strings pay interpreter overhead for every cell;
+        # Arrow concatenates whole string arrays in C
+        # Categoricals arrive as Arrow dictionary arrays and are decoded in C
+        commodity = pc.cast(pa.array(df_clean['Commodity']), pa.string())
+        supplier = pc.cast(pa.array(df_clean['Top Supplier']), pa.string())
+        qty_str = pc.cast(pa.array(df_clean['Quantity (KG)']), pa.string())
+        spend_str = _format_numbers(df_clean['Spend (USD)'], '{:,.2f}')
+        price_str = _format_numbers(df_clean['Price_per_KG'], '{:.2f}')
 
-            # Main description
-            main_text = (
-                f"Commodity: {row['Commodity']}. "
-                f"Top Supplier: {row['Top Supplier']}. "
-                f"Quantity Purchased: {row['Quantity (KG)']} kilograms. "
-                f"Total Spend: ${row['Spend (USD)']:,.2f} USD. "
-                f"Price per kilogram: ${row['Price_per_KG']:.2f}."
-            )
+        def concat(*parts):
+            return pc.binary_join_element_wise(*parts, '')
 
-            # Supplier-focused view
-            supplier_text = (
-                f"{row['Top Supplier']} supplies {row['Commodity']}, "
-                f"with {row['Quantity (KG)']} kg purchased for ${row['Spend (USD)']:,.2f}."
-            )
+        # Main description
+        main_text = concat(
+            'Commodity: ', commodity, '. ',
+            'Top Supplier: ', supplier, '. ',
+            'Quantity Purchased: ', qty_str, ' kilograms. ',
+            'Total Spend: $', spend_str, ' USD. ',
+            'Price per kilogram: $', price_str, '.'
+        )
 
-            # Cost analysis view
-            cost_text = (
-                f"The spend on {row['Commodity']} is ${row['Spend (USD)']:,.2f}, "
-                f"sourced from {row['Top Supplier']} at ${row['Price_per_KG']:.2f} per kg."
-            )
+        # Supplier-focused view
+        supplier_text = concat(
+            supplier, ' supplies ', commodity, ', ',
+            'with ', qty_str, ' kg purchased for $', spend_str, '.'
+        )
 
-            # Combined comprehensive text for embedding
-            combined_text = f"{main_text} {supplier_text} {cost_text}"
+        # Cost analysis view
+        cost_text = concat(
+            'The spend on ', commodity, ' is $', spend_str, ', ',
+            'sourced from ', supplier, ' at $', price_str, ' per kg.'
+        )
 
-            chunk = {
+        # Combined comprehensive text for embedding
+        combined_text = pc.binary_join_element_wise(main_text, supplier_text, cost_text, ' ')
+
+        # Plain tuples avoid building a Series (or dict) per row
+        rows = df_clean[
+            ['Commodity', 'Top Supplier', 'Quantity (KG)', 'Spend (USD)', 'Price_per_KG']
+        ].itertuples(index=True, name=None)
+
+        chunks = [
+            {
                 "id": f"row_{idx}",
-                "text": combined_text,
+                "text": text,
                 "metadata": {
-                    "commodity": row['Commodity'],
-                    "supplier": row['Top Supplier'],
-                    "quantity_kg": float(row['Quantity (KG)']),
-                    "spend_usd": float(row['Spend (USD)']),
-                    "price_per_kg": float(row['Price_per_KG']),
-                    "row_index": int(idx)
+                    "commodity": commodity,
+                    "supplier": supplier_name,
+                    "quantity_kg": float(quantity),
+                    "spend_usd": float(spend),
+                    "price_per_kg": float(price),
+                    "row_index": int(idx),
+                    "level": "row"
                 }
             }
-            chunks.append(chunk)
+            for text, (idx, commodity, supplier_name, quantity, spend, price)
+            in zip(combined_text.to_pylist(), rows)
+        ]
 
         logger.info(f"Created {len(chunks)} text chunks")
         return chunks
 
+    def create_hierarchical_chunks(self) -> List[Dict]:
+        """
+        Create row chunks plus per-commodity and per-supplier summary chunks.
+
+        Why: Aggregate questions ("total spend on X", "what does Y supply")
+        can be answered from a single pre-aggregated parent chunk instead of
+        retrieving and re-adding many row chunks.
+        """
+        chunks = self.create_text_chunks()
+        chunks += self._create_group_chunks('Commodity', 'commodity')
+        chunks += self._create_group_chunks('Top Supplier', 'supplier')
+
+        logger.info(f"Created {len(chunks)} hierarchical chunks")
+        return chunks
+
+    def _create_group_chunks(self, column: str, level: str) -> List[Dict]:
+        """Aggregate cleaned rows by `column` into one summary chunk per group"""
+        df_clean = self.clean_data()
+        other = 'Top Supplier' if column == 'Commodity' else 'Commodity'
+
+        grouped = df_clean.groupby(column, observed=True).agg(
+            spend=('Spend (USD)', 'sum'),
+            quantity=('Quantity (KG)', 'sum'),
+            purchases=('Spend (USD)', 'size'),
+            related=(other, lambda s: ', '.join(sorted(s.astype(str).unique())))
+        )
+
+        chunks = []
+        for name, spend, quantity, purchases, related in grouped.itertuples(name=None):
+            price = spend / quantity
+            if level == 'commodity':
+                text = (
+                    f"Commodity summary for {name}: total spend ${spend:,.2f} USD "
+                    f"across {purchases} purchase(s), total quantity {_format_quantity(quantity)} kilograms, "
+                    f"average price ${price:.2f} per kilogram. Suppliers: {related}."
+                )
+                commodity, supplier = str(name), related
+            else:
+                text = (
+                    f"Supplier summary for {name}: total spend ${spend:,.2f} USD "
+                    f"across {purchases} purchase(s), total quantity {_format_quantity(quantity)} kilograms, "
+                    f"average price ${price:.2f} per kilogram. Commodities supplied: {related}."
+                )
+                commodity, supplier = related, str(name)
+
+            chunks.append({
+                "id": f"{level}_{name}",
+                "text": text,
+                "metadata": {
+                    "commodity": commodity,
+                    "supplier": supplier,
+                    "quantity_kg": float(quantity),
+                    "spend_usd": float(spend),
+                    "price_per_kg": float(price),
+                    "row_count": int(purchases),
+                    "level": level
+                }
+            })
+
+        return chunks
+
     def get_summary_stats(self) -> Dict:
         """Get summary statistics for context"""
         df_clean = self.clean_data()
 
+        # Single aggregation call over the numeric columns
+        totals = df_clean[['Spend (USD)', 'Quantity (KG)', 'Price_per_KG']].agg(
+            {'Spend (USD)': 'sum', 'Quantity (KG)': 'sum', 'Price_per_KG': 'mean'}
+        )
+
         return {
             "total_commodities": len(df_clean),
-            "total_spend": float(df_clean['Spend (USD)'].sum()),
-            "total_quantity": float(df_clean['Quantity (KG)'].sum()),
-            "avg_price_per_kg": float(df_clean['Price_per_KG'].mean()),
-            "commodities": df_clean['Commodity'].tolist(),
-            "suppliers": df_clean['Top Supplier'].tolist()
+            "total_spend": float(totals['Spend (USD)']),
+            "total_quantity": float(totals['Quantity (KG)']),
+            "avg_price_per_kg": float(totals['Price_per_KG']),
+            "commodities": df_clean['Commodity'].to_numpy().tolist(),
+            "suppliers": df_clean['Top Supplier'].to_numpy().tolist()
         }
@@ -1,11 +1,14 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 import os
+import asyncio
 import logging
-from typing import Dict
+from typing import Dict, Optional
 from pathlib import Path
 import socket
+import orjson
 
 from .models import ChatRequest, ChatResponse
 from .data_processor import DataProcessor
@@ -30,7 +33,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Sugar Spend AI Chatbot",
     description="RAG-powered chatbot for commodity spend analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # C-level JSON serialization
 )
 
 # CORS configuration - ALLOW ALL ORIGINS FOR NETWORK ACCESS
@@ -47,15 +51,25 @@ rag_pipeline: RAGPipeline = None
 data_processor: DataProcessor = None
 summary_stats: Dict = None
 
+_local_ip: Optional[str] = None
+
 def get_local_ip():
-    """Get the local IP address of this machine"""
+    """
+    Get the local IP address of this machine.
+
+    A successful lookup is cached for the process; the "localhost" fallback
+    is not, so a network that comes up after startup is still picked up.
+    """
+    global _local_ip
+    if _local_ip is not None:
+        return _local_ip
     try:
         # Create a socket connection to get local IP
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
+        _local_ip = s.getsockname()[0]
         s.close()
-        return ip
+        return _local_ip
     except Exception:
         return "localhost"
 
@@ -79,7 +93,7 @@ async def startup_event():
     # Initialize data processor
     logger.info("📊 Loading and processing data...")
     data_processor = DataProcessor("data/Sugar_Spend_Data.csv")
-    chunks = data_processor.create_text_chunks()
+    chunks = data_processor.create_hierarchical_chunks()
     summary_stats = data_processor.get_summary_stats()
 
     # Initialize RAG pipeline
@@ -90,6 +104,9 @@ async def startup_event():
     logger.info("📝 Embedding documents...")
     rag_pipeline.embed_documents(chunks)
 
+    # Start micro-batching of query embeddings
+    rag_pipeline.start_query_batcher()
+
     # Display network access info
     local_ip = get_local_ip()
     logger.info("✅ Startup complete! Ready to chat.")
@@ -99,6 +116,12 @@ async def startup_event():
     logger.info(f"   Network: http://{local_ip}:8000")
     logger.info("="*60)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks on shutdown."""
+    if rag_pipeline is not None:
+        await rag_pipeline.stop_query_batcher()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -117,8 +140,13 @@ async def get_stats():
     return summary_stats
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """Main chat endpoint for RAG queries."""
+async def chat(request: ChatRequest, stream: bool = False):
+    """
+    Main chat endpoint for RAG queries.
+
+    With ?stream=true the answer is sent as Server-Sent Events: token events
+    while Gemini generates, then a final event with the sources.
+    """
     if not rag_pipeline:
         raise HTTPException(
             status_code=503,
@@ -128,10 +156,34 @@ async def chat(request: ChatRequest):
     try:
         logger.info(f"Received query: {request.message}")
 
-        # Execute RAG pipeline
-        response = rag_pipeline.query(
+        # Embed the query through the shared micro-batcher
+        query_embedding = await rag_pipeline.aembed_query(request.message)
+
+        if stream:
+            # Retrieve before the response starts, so retrieval errors still
+            # become a 500 instead of a truncated stream
+            logger.info(f"📥 NEW STREAMING QUERY: {request.message}")
+            contexts, metadatas = await asyncio.to_thread(
+                rag_pipeline.retrieve_relevant_chunks, request.message, query_embedding
+            )
+            events = rag_pipeline.generate_answer_stream(
+                request.message,
+                contexts,
+                metadatas,
+                request.conversation_history
+            )
+            return StreamingResponse(
+                (b"data: " + orjson.dumps(event) + b"\n\n" for event in events),
+                media_type="text/event-stream"
+            )
+
+        # Execute RAG pipeline off the event loop (Chroma, re-ranker and the
+        # Gemini call all block), so other requests keep reaching the batcher
+        response = await asyncio.to_thread(
+            rag_pipeline.query,
             user_query=request.message,
-            conversation_history=request.conversation_history
+            conversation_history=request.conversation_history,
+            query_embedding=query_embedding
         )
 
         return ChatResponse(
@@ -5,12 +5,42 @@ Works on Windows, Mac, and Linux - Zero Config Required
 """
 
 import subprocess
+import socket
+import urllib.request
+import urllib.error
 import sys
 import os
+import io
 import time
 import platform
+import shutil
+import shlex
+import hashlib
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Launcher-invariant platform info and paths, computed once
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == "Windows"
+BACKEND_DIR = Path("chatbot-backend")
+FRONTEND_DIR = Path("chatbot-frontend")
+VENV_DIR = BACKEND_DIR / "env"
+VENV_PY = VENV_DIR / ("Scripts/python.exe" if IS_WINDOWS else "bin/python")
+
+# Launcher settings
+SUBPROCESS_TIMEOUT = 300  # Seconds before an install command is killed
+
+# npm resolved once so it can be exec'd directly instead of through a shell
+NPM = shutil.which("npm") or shutil.which("npm.cmd")
+NODE = shutil.which("node")
+# A system-wide uv lets the venv skip pip entirely
+UV = shutil.which("uv")
+CREATE_NO_WINDOW = 0x08000000  # Windows: don't allocate a console for npm
+CREATE_NEW_CONSOLE = 0x00000010  # Windows: give each server its own console window
+
 def print_banner():
     banner = """
     ========================================
@@ -19,70 +49,106 @@ def print_banner():
     """
     print(banner)
 
-def print_section(title):
-    print(f"\n{'='*50}")
-    print(f"  {title}")
-    print('='*50)
+def print_section(title, log=print):
+    log(f"\n{'='*50}")
+    log(f"  {title}")
+    log('='*50)
+
+_status_lock = threading.Lock()
+
+def show_status(text=""):
+    """Overwrite the current terminal line with a short status (empty clears it)"""
+    with _status_lock:
+        print(f"\r   {text[:76]:<76}\r" if text else "\r" + " " * 80 + "\r", end='', flush=True)
+
+def run_command(cmd, cwd=None, shell=False, log=print, env=None, creationflags=0, label=None, timeout=SUBPROCESS_TIMEOUT):
+    """
+    Run command with proper error handling.
 
-def run_command(cmd, cwd=None, shell=False):
-    """Run command with proper error handling"""
+    Output is read line by line instead of being buffered whole: the latest
+    line is shown as a status line (when `label` is given) and only a rolling
+    tail is kept, which is logged if the command fails.
+    """
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             cmd,
             cwd=cwd,
             shell=shell,
+            env=env,
+            creationflags=creationflags,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=300  # 5 minute timeout
+            errors='replace',
+            bufsize=1
         )
-        return result.returncode == 0
     except Exception as e:
-        print(f"   Warning: {e}")
+        log(f"   Warning: {e}")
         return False
 
-def setup_backend():
-    """Setup backend environment"""
-    print_section("🔧 Backend Setup")
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    last_lines = deque(maxlen=200)
+    try:
+        for line in process.stdout:
+            last_lines.append(line.rstrip())
+            if label and line.strip():
+                show_status(f"[{label}] {line.strip()}")
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        if label:
+            show_status()
+
+    if returncode != 0:
+        log(f"   Warning: command exited with code {returncode}")
+        for line in last_lines:
+            log(f"   | {line}")
+    return returncode == 0
+
+def file_hash(path):
+    """SHA-256 of a file's contents (None if the file doesn't exist)"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
 
-    backend_dir = Path("chatbot-backend")
-    venv_path = backend_dir / "env"
+def marker_matches(marker, digest):
+    """True if `marker` records `digest` from a previous successful install"""
+    return digest is not None and marker.exists() and marker.read_text().strip() == digest
 
-    # Create virtual environment
-    if not venv_path.exists():
-        print("📦 Creating virtual environment...")
-        if run_command([sys.executable, "-m", "venv", str(venv_path)]):
-            print("✅ Virtual environment created")
-        else:
-            print("❌ Failed to create virtual environment")
-            return False
-    else:
-        print("✅ Virtual environment exists")
+def venv_has_pip():
+    """True if pip is installed in the backend venv (it may be created without)"""
+    return any(VENV_DIR.glob("Lib/site-packages/pip")) or any(VENV_DIR.glob("lib/python*/site-packages/pip"))
 
-    # Get pip path
-    system = platform.system()
-    if system == "Windows":
-        pip_exe = venv_path / "Scripts" / "pip.exe"
-    else:
-        pip_exe = venv_path / "bin" / "pip"
+def node_modules_fresh():
+    """
+    True if the last npm install completed and is newer than package-lock.json.
 
-    # Install dependencies
-    print("📥 Installing backend dependencies (1-2 minutes)...")
-    print("   Installing packages silently...")
+    npm writes node_modules/.package-lock.json at the end of a successful
+    install, so a half-written node_modules (e.g. after Ctrl-C) isn't fresh.
+    """
+    try:
+        installed = (FRONTEND_DIR / "node_modules" / ".package-lock.json").stat().st_mtime
+    except FileNotFoundError:
+        return False
+    try:
+        return installed >= (FRONTEND_DIR / "package-lock.json").stat().st_mtime
+    except FileNotFoundError:
+        return True
 
-    # Upgrade pip first
-    run_command([str(pip_exe), "install", "--upgrade", "pip", "--quiet"])
+def ensure_api_key():
+    """Make sure the backend .env has a Gemini API key (prompts once)"""
+    env_file = BACKEND_DIR / ".env"
 
-    # Install requirements
-    if run_command([str(pip_exe), "install", "-r", "requirements.txt", "--quiet"], cwd=backend_dir):
-        print("✅ Backend dependencies installed")
-    else:
-        print("❌ Failed to install dependencies")
-        return False
+    # One stat() call; an empty/truncated .env (e.g. from an interrupted
+    # write) counts as missing
+    try:
+        has_key = env_file.stat().st_size > len("GEMINI_API_KEY=") + 1
+    except FileNotFoundError:
+        has_key = False
 
-    # Check .env file
-    env_file = backend_dir / ".env"
-    if not env_file.exists():
+    if not has_key:
         print("\n⚠️  API Key Required!")
         print("\n   Get your FREE Gemini API key:")
         print("   👉 https://aistudio.google.com/apikey")
@@ -90,8 +156,11 @@ def setup_backend():
         api_key = input("\n   Paste your API key: ").strip()
 
         if api_key:
-            with open(env_file, 'w') as f:
-                f.write(f"GEMINI_API_KEY={api_key}\n")
+            # Unbuffered write + fsync so the key is on disk even if the
+            # launcher is interrupted right after
+            with open(env_file, 'wb', buffering=0) as f:
+                f.write(f"GEMINI_API_KEY={api_key}\n".encode())
+                os.fsync(f.fileno())
             print("✅ API key saved!")
         else:
             print("\n❌ Cannot start without API key")
@@ -101,91 +170,220 @@ def setup_backend():
 
     return True
 
-def setup_frontend():
-    """Setup frontend environment"""
-    print_section("🎨 Frontend Setup")
+def setup_backend(log=print):
+    """Setup backend environment"""
+    print_section("🔧 Backend Setup", log)
+
+    # Create virtual environment
+    # Why: With uv on PATH, pip isn't needed inside the venv, so skip the
+    # ensurepip bootstrap (the slowest part of venv creation)
+    if not VENV_DIR.exists():
+        log("📦 Creating virtual environment...")
+        without_pip = ["--without-pip"] if UV else []
+        if run_command([sys.executable, "-m", "venv", *without_pip, str(VENV_DIR)], log=log, label="backend"):
+            log("✅ Virtual environment created")
+        else:
+            log("❌ Failed to create virtual environment")
+            return False
+    else:
+        log("✅ Virtual environment exists")
+
+    # pip is run as a module of the venv Python so it can upgrade itself on Windows
+    # (absolute path because pip runs with cwd=BACKEND_DIR). -I (isolated mode)
+    # skips user site/usercustomize and PYTHON* env vars; PIP_* still apply.
+    venv_python = VENV_PY.absolute()
+
+    # Skip pip entirely if requirements.txt hasn't changed since the last install
+    requirements_hash = file_hash(BACKEND_DIR / "requirements.txt")
+    requirements_marker = VENV_DIR / ".requirements.sha256"
+    if marker_matches(requirements_marker, requirements_hash):
+        log("✅ Backend dependencies up to date")
+        return True
 
-    frontend_dir = Path("chatbot-frontend")
-    node_modules = frontend_dir / "node_modules"
+    # Install dependencies
+    log("📥 Installing backend dependencies (1-2 minutes)...")
+    log("   Installing packages silently...")
+
+    # uv ignores PIP_* variables and pip.conf, so carry a configured index
+    # (corporate mirror, offline index) over to uv's own variables
+    uv_env = dict(os.environ)
+    for pip_var, uv_var in (("PIP_INDEX_URL", "UV_INDEX_URL"), ("PIP_EXTRA_INDEX_URL", "UV_EXTRA_INDEX_URL")):
+        if pip_var in os.environ:
+            uv_env.setdefault(uv_var, os.environ[pip_var])
+
+    # Prefer uv (Rust resolver/installer): the system one if available,
+    # otherwise installed into the venv so the system Python is left untouched
+    if UV:
+        installed = run_command([UV, "pip", "install", "--python", str(venv_python), "-r", "requirements.txt", "--quiet"], cwd=BACKEND_DIR, log=log, env=uv_env, label="backend")
+    else:
+        installed = (
+            run_command([str(venv_python), "-I", "-m", "pip", "install", "uv", "--quiet"], log=log, label="backend")
+            and run_command([str(venv_python), "-I", "-m", "uv", "pip", "install", "--python", str(venv_python), "-r", "requirements.txt", "--quiet"], cwd=BACKEND_DIR, log=log, env=uv_env, label="backend")
+        )
 
-    if not node_modules.exists():
-        print("📥 Installing frontend dependencies (1-2 minutes)...")
-        print("   Installing packages silently...")
+    # Fall back to pip: upgrade pip (first run only) and install requirements
+    # in one call (one pip startup and resolve), preferring wheels over sdists
+    if not installed:
+        log("   uv unavailable, installing with pip...")
+        if not venv_has_pip():
+            run_command([str(venv_python), "-I", "-m", "ensurepip", "--upgrade"], log=log, label="backend")
+        pip_marker = VENV_DIR / ".pip-upgraded"
+        upgrade_pip = [] if pip_marker.exists() else ["--upgrade", "pip"]
+        installed = run_command([str(venv_python), "-I", "-m", "pip", "install", "--prefer-binary", *upgrade_pip, "-r", "requirements.txt", "--quiet"], cwd=BACKEND_DIR, log=log, label="backend")
+        if installed and upgrade_pip:
+            pip_marker.touch()
+
+    if installed:
+        log("✅ Backend dependencies installed")
+        requirements_marker.write_text(requirements_hash)
+    else:
+        log("❌ Failed to install dependencies")
+        return False
 
-        if run_command(["npm", "install", "--silent"], cwd=frontend_dir, shell=True):
-            print("✅ Frontend dependencies installed")
+    return True
+
+def setup_frontend(log=print):
+    """Setup frontend environment"""
+    print_section("🎨 Frontend Setup", log)
+
+    # Fail fast if Node.js isn't installed instead of letting npm fail later
+    if NODE is None or NPM is None:
+        log("⚠️  Node.js not found")
+        log("\n   Please install Node.js from: https://nodejs.org/")
+        log("   Then restart terminal and run: python start.py")
+        return False
+
+    # Reinstall unless the last install completed and package-lock.json is
+    # unchanged (cheap mtime check first, content hash if the lockfile was touched)
+    lock_marker = FRONTEND_DIR / "node_modules" / ".package-lock-hash"
+    up_to_date = node_modules_fresh() or (
+        (FRONTEND_DIR / "node_modules" / ".package-lock.json").exists()
+        and marker_matches(lock_marker, file_hash(FRONTEND_DIR / "package-lock.json"))
+    )
+
+    if not up_to_date:
+        log("📥 Installing frontend dependencies (1-2 minutes)...")
+        log("   Installing packages silently...")
+
+        # npm ci installs exactly what the lockfile says (no resolution) and
+        # prefers the local cache; fall back to npm install without a lockfile
+        if (FRONTEND_DIR / "package-lock.json").exists():
+            npm_cmd = [NPM, "ci", "--prefer-offline", "--no-audit", "--no-fund", "--silent"]
+        else:
+            npm_cmd = [NPM, "install", "--silent"]
+
+        npm_flags = CREATE_NO_WINDOW if IS_WINDOWS else 0
+        if run_command(npm_cmd, cwd=FRONTEND_DIR, log=log, creationflags=npm_flags, label="frontend"):
+            log("✅ Frontend dependencies installed")
+            # Re-hash: npm install may rewrite package-lock.json
+            lock_hash = file_hash(FRONTEND_DIR / "package-lock.json")
+            if lock_hash:
+                lock_marker.write_text(lock_hash)
             return True
         else:
-            print("\n⚠️  Could not install frontend dependencies")
-            print("\n   Please install Node.js from: https://nodejs.org/")
-            print("   Then restart terminal and run: python start.py")
+            # Node.js/npm were found above, so this is a lockfile or network problem
+            log("\n⚠️  Could not install frontend dependencies (see the npm output above)")
+            log("\n   To retry manually:")
+            log("       cd chatbot-frontend")
+            log(f"       npm {npm_cmd[1]}")
+            log("   Then run: python start.py")
             return False
     else:
-        print("✅ Frontend dependencies exist")
+        log("✅ Frontend dependencies exist")
         return True
 
+def _poll_backend(ready, url, deadline):
+    """Set `ready` as soon as the backend health check returns 200"""
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=0.5) as response:
+                if response.status == 200:
+                    ready.set()
+                    return
+        except (urllib.error.URLError, socket.timeout, ConnectionError):
+            pass
+        time.sleep(0.25)
+
+def wait_for_backend(url="http://127.0.0.1:8000/", timeout=30):
+    """
+    Wait for the backend health check, drawing a progress bar meanwhile.
+
+    Polling runs on a background thread, so the animation never delays
+    detecting readiness. Returns True as soon as the backend responds,
+    False if `timeout` seconds pass first.
+    """
+    ready = threading.Event()
+    start = time.monotonic()
+    deadline = start + timeout
+    threading.Thread(target=_poll_backend, args=(ready, url, deadline), daemon=True).start()
+
+    while not ready.wait(timeout=0.25):
+        if time.monotonic() >= deadline:
+            print()
+            return False
+        done = min(int((time.monotonic() - start) / timeout * 10), 9)
+        print(f"   {'▓' * done}{'░' * (10 - done)} {done * 10}%", end='\r')
+
+    print(f"   {'▓' * 10} 100%")
+    return True
+
+def terminal_command(workdir, argv):
+    """
+    Build (args, options) that run `argv` in `workdir` in a new terminal window.
+
+    On Windows the server gets its own console (CREATE_NEW_CONSOLE) through
+    cmd.exe, which pauses if the server exits with an error so the message
+    stays readable; on Mac/Linux it runs in Terminal/gnome-terminal.
+    """
+    if IS_WINDOWS:
+        # /s strips only the outer quotes, leaving the inner argv quoting intact
+        cmdline = f'cmd /s /c "{subprocess.list2cmdline(argv)} || pause"'
+        return cmdline, {"cwd": str(workdir), "creationflags": CREATE_NEW_CONSOLE}
+
+    cmd = f"cd {shlex.quote(str(workdir))} && {shlex.join(argv)}"
+    if SYSTEM == "Darwin":
+        return ["osascript", "-e", f'tell app "Terminal" to do script "{cmd}"'], {}
+    return ["gnome-terminal", "--", "bash", "-c", f"{cmd}; exec bash"], {}
+
 def start_servers(start_frontend=True):
-    """Start servers"""
+    """
+    Start servers in their own terminal windows.
+
+    The servers are detached launches, so plain Popen (without shell=True)
+    is enough; the handles are returned so the launcher keeps them alive.
+    """
     print_section("🚀 Starting Servers")
 
-    system = platform.system()
-    backend_dir = Path("chatbot-backend").absolute()
-    frontend_dir = Path("chatbot-frontend").absolute()
-
-    # Get Python executable path
-    if system == "Windows":
-        venv_python = backend_dir / "env" / "Scripts" / "python.exe"
-    else:
-        venv_python = backend_dir / "env" / "bin" / "python"
+    backend_dir = BACKEND_DIR.absolute()
+    frontend_dir = FRONTEND_DIR.absolute()
+    venv_python = VENV_PY.absolute()
+    processes = []
 
     # Start backend
     print("🔧 Starting backend server...")
-    if system == "Windows":
-        batch_content = f'''@echo off
-title Backend - Sugar Commodity AI Chatbot
-cd /d "{backend_dir}"
-"{venv_python}" -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
-pause'''
-        batch_file = Path("_start_backend.bat")
-        batch_file.write_text(batch_content, encoding='utf-8')
-        subprocess.Popen(["cmd", "/c", "start", "cmd", "/k", str(batch_file)], shell=True)
-    else:
-        cmd = f'cd "{backend_dir}" && "{venv_python}" -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000'
-        if system == "Darwin":
-            subprocess.Popen(["osascript", "-e", f'tell app "Terminal" to do script "{cmd}"'])
-        else:
-            subprocess.Popen(["gnome-terminal", "--", "bash", "-c", f"{cmd}; exec bash"])
-
+    backend_cmd, backend_options = terminal_command(
+        backend_dir,
+        [str(venv_python), "-m", "uvicorn", "app.main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"]
+    )
+    processes.append(subprocess.Popen(backend_cmd, **backend_options))
     print("✅ Backend server starting (port 8000)")
 
-    # Wait for backend
-    if start_frontend:
-        print("\n⏳ Initializing backend (10 seconds)...")
-        for i in range(10):
-            print(f"   {'▓' * (i+1)}{'░' * (9-i)} {(i+1)*10}%", end='\r')
-            time.sleep(1)
-        print("\n")
+    if not start_frontend:
+        return processes
 
-    # Start frontend
-    if start_frontend:
-        print("🎨 Starting frontend server...")
-        if system == "Windows":
-            batch_content = f'''@echo off
-title Frontend - Sugar Commodity AI Chatbot
-cd /d "{frontend_dir}"
-npm run dev
-pause'''
-            batch_file = Path("_start_frontend.bat")
-            batch_file.write_text(batch_content, encoding='utf-8')
-            subprocess.Popen(["cmd", "/c", "start", "cmd", "/k", str(batch_file)], shell=True)
-        else:
-            cmd = f'cd "{frontend_dir}" && npm run dev'
-            if system == "Darwin":
-                subprocess.Popen(["osascript", "-e", f'tell app "Terminal" to do script "{cmd}"'])
-            else:
-                subprocess.Popen(["gnome-terminal", "--", "bash", "-c", f"{cmd}; exec bash"])
+    # Wait for the backend before launching the frontend
+    print("\n⏳ Waiting for backend to become ready...")
+    if wait_for_backend():
+        print("✅ Backend is ready\n")
+    else:
+        print("⚠️  Backend is still starting, launching frontend anyway\n")
 
-        print("✅ Frontend server starting (port 3000)")
+    # Start frontend
+    print("🎨 Starting frontend server...")
+    frontend_cmd, frontend_options = terminal_command(frontend_dir, [NPM, "run", "dev"])
+    processes.append(subprocess.Popen(frontend_cmd, **frontend_options))
+    print("✅ Frontend server starting (port 3000)")
+    return processes
 
 def main():
     """Main function"""
@@ -200,18 +398,33 @@ def main():
             input("\nPress Enter to exit...")
             return
 
-        # Setup backend
-        backend_ok = setup_backend()
+        # Ask for the API key up front, before any background output starts
+        print_section("🔑 API Key")
+        if not ensure_api_key():
+            input("\nPress Enter to exit...")
+            return
+
+        # Setup backend and frontend in parallel
+        # Why: pip and npm work on separate directories and are mostly waiting
+        # on network/disk, so running them together saves the shorter of the two.
+        # Each task's output is buffered and printed as a block to keep it readable.
+        print("\n📥 Installing backend and frontend dependencies in parallel (1-2 minutes)...")
+        backend_log, frontend_log = io.StringIO(), io.StringIO()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            backend_future = executor.submit(setup_backend, functools.partial(print, file=backend_log))
+            frontend_future = executor.submit(setup_frontend, functools.partial(print, file=frontend_log))
+            backend_ok, frontend_ok = backend_future.result(), frontend_future.result()
+        print(backend_log.getvalue(), end='')
+        print(frontend_log.getvalue(), end='')
+
         if not backend_ok:
             print("\n❌ Backend setup failed")
             input("\nPress Enter to exit...")
             return
 
-        # Setup frontend
-        frontend_ok = setup_frontend()
-
         # Start servers
-        start_servers(start_frontend=frontend_ok)
+        # Handles are held while the launcher runs; the servers outlive it
+        server_processes = start_servers(start_frontend=frontend_ok)
 
         # Success message
         print_section("✅ Success!")